@@ -70,6 +70,8 @@ Environment Variables
   EXTRACT_INPUT_PREFIX    Input prefix (default: documents)
   EXTRACT_OUTPUT_PREFIX   Output prefix (default: extracted)
   EXTRACT_WORKERS         Worker count (default: 4)
+  EXTRACT_INCLUDE_EXTRACTION
+                          Set to 0 to skip the {hash}.json structure (default: 1)
 
 Examples
   corpus extract                    # Extract all documents
@@ -115,6 +117,7 @@ export async function runExtract(args: string[]) {
     outputPrefix: envConfig.extract.outputPrefix,
     batchSize: flags.batchSize ?? 1000000,
     workers: flags.workers ?? envConfig.extract.workers,
+    includeExtraction: envConfig.extract.includeExtraction,
   };
 
   console.log("Text Extractor");
@@ -16,6 +16,7 @@ export interface ExtractorConfig {
     outputPrefix: string;
     batchSize: number;
     workers: number;
+    includeExtraction: boolean;
   };
 }
 
@@ -40,6 +41,7 @@ export function loadExtractorConfig(): ExtractorConfig {
       outputPrefix: env.EXTRACT_OUTPUT_PREFIX || "extracted",
       batchSize: parseInt(env.EXTRACT_BATCH_SIZE || "100", 10),
       workers: parseInt(env.EXTRACT_WORKERS || "4", 10),
+      includeExtraction: env.EXTRACT_INCLUDE_EXTRACTION !== "0",
     },
   };
 }
@@ -20,8 +20,11 @@ class PersistentExtractor {
   private stdoutReader: ReadableStreamDefaultReader<Uint8Array> | null = null;
   private decoder = new TextDecoder();
 
+  constructor(private readonly includeExtraction: boolean) {}
+
   async start(): Promise<void> {
-    this.proc = Bun.spawn([PYTHON_PATH, SCRIPT_PATH], {
+    const args = this.includeExtraction ? [] : ["--no-extraction"];
+    this.proc = Bun.spawn([PYTHON_PATH, SCRIPT_PATH, ...args], {
       stdin: "pipe",
       stdout: "pipe",
       stderr: "inherit",
@@ -125,7 +128,7 @@ export async function processDirectory(
   config: ExtractConfig,
   verbose: boolean = false
 ): Promise<void> {
-  const { db, storage, inputPrefix, outputPrefix, batchSize } = config;
+  const { db, storage, inputPrefix, outputPrefix, batchSize, includeExtraction } = config;
 
   // Get extraction stats from database
   const stats = await db.getExtractionStats();
@@ -166,7 +169,10 @@ export async function processDirectory(
   }
 
   console.log("\nExtraction complete!");
-  console.log(`  Output: ${outputPrefix}/{hash}.txt, ${outputPrefix}/{hash}.json`);
+  const outputs = includeExtraction
+    ? `${outputPrefix}/{hash}.txt, ${outputPrefix}/{hash}.json`
+    : `${outputPrefix}/{hash}.txt`;
+  console.log(`  Output: ${outputs}`);
 }
 
 const EXTRACTION_TIMEOUT_MS = 30_000; // 30 seconds per document
@@ -178,7 +184,7 @@ async function processBatch(
   tempDir: string,
   verbose: boolean
 ): Promise<{ successCount: number; errorCount: number }> {
-  const { db, storage, inputPrefix, outputPrefix, workers } = config;
+  const { db, storage, inputPrefix, outputPrefix, workers, includeExtraction } = config;
   let successCount = 0;
   let errorCount = 0;
   const queue = [...documents];
@@ -225,7 +231,7 @@ async function processBatch(
 
   console.log(`Starting ${numWorkers} persistent Python extractor(s)...`);
   for (let i = 0; i < numWorkers; i++) {
-    const extractor = new PersistentExtractor();
+    const extractor = new PersistentExtractor(includeExtraction);
     await extractor.start();
     extractors.push(extractor);
   }
@@ -257,11 +263,13 @@ async function processBatch(
     // Write text file to storage
     await storage.write(`${outputPrefix}/${doc.id}.txt`, result.text!);
 
-    // Write extraction JSON to storage
-    await storage.write(
-      `${outputPrefix}/${doc.id}.json`,
-      JSON.stringify(result.extraction)
-    );
+    // Write extraction JSON to storage (omitted when includeExtraction is off)
+    if (result.extraction !== undefined) {
+      await storage.write(
+        `${outputPrefix}/${doc.id}.json`,
+        JSON.stringify(result.extraction)
+      );
+    }
 
     // Update database with extraction metadata
     await db.updateExtraction({
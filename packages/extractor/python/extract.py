@@ -1,46 +1,57 @@
 #!/usr/bin/env python3
-"""Single-file DOCX extraction using Docling. Outputs JSON to stdout."""
+"""Single-file DOCX extraction using Docling. Outputs JSON to stdout.
+
+Usage: extract.py [--no-extraction] <file.docx>
+
+Deprecated: every invocation pays the full Docling import. Prefer the persistent
+extract_server.py (used by the extractor package), which imports once and
+handles many documents per process.
+"""
 import json
 import sys
 from pathlib import Path
 
 
-def extract(file_path: str) -> dict:
-    """Extract text and structure from a DOCX file using Docling."""
-    from docling.document_converter import DocumentConverter
+def extract(file_path: str, include_extraction: bool = True) -> dict:
+    """Extract text and structure from a DOCX file using Docling.
 
-    converter = DocumentConverter()
-    result = converter.convert(file_path)
+    Thin wrapper over extract_server.extract() so both entry points share one
+    implementation and produce the same fields.
+    """
+    # Imported lazily so argument/path errors exit without loading Docling
+    import msgspec
+    from docling.document_converter import DocumentConverter
+    from docling.datamodel.base_models import InputFormat
 
-    # Export as markdown for text extraction
-    text = result.document.export_to_markdown()
+    import extract_server
 
-    # Get full structured extraction (raw, no stripping)
-    extraction = result.document.export_to_dict()
+    fields = extract_server.ALL_FIELDS
+    if not include_extraction:
+        fields -= {"extraction"}
 
-    return {
-        "text": text,
-        "wordCount": len(text.split()),
-        "charCount": len(text),
-        "tableCount": len(extraction.get("tables", [])),
-        "imageCount": len(extraction.get("pictures", [])),
-        "extraction": extraction,
-    }
+    # Restrict to DOCX so other formats' pipelines and backends are never set up
+    converter = DocumentConverter(allowed_formats=[InputFormat.DOCX])
+    result = extract_server.extract(converter, file_path, fields)
+    return msgspec.to_builtins(result, enc_hook=str)
 
 
 def main():
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    include_extraction = "--no-extraction" not in args
+    paths = [arg for arg in args if arg != "--no-extraction"]
+
+    if not paths:
         print(json.dumps({"error": "No file path provided"}), file=sys.stderr)
         sys.exit(1)
 
-    file_path = sys.argv[1]
+    file_path = paths[0]
 
     if not Path(file_path).exists():
         print(json.dumps({"error": f"File not found: {file_path}"}), file=sys.stderr)
         sys.exit(1)
 
     try:
-        result = extract(file_path)
+        result = extract(file_path, include_extraction)
         print(json.dumps(result))
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)
@@ -3,69 +3,218 @@
 
 Reads file paths from stdin (one per line), outputs JSON per line to stdout.
 This avoids the overhead of spawning a new Python process for each document.
+
+A line may instead be a JSON request, e.g.
+{"path": "...", "mode": "text", "fields": ["wordCount", "language"]}.
+mode "text" skips Docling and reads word/document.xml directly; the result has
+the same counts and language fields but no "extraction" (listing it in fields
+is an error). fields limits the result to the listed keys, and only those are
+computed.
+
+Pass --no-extraction to leave "extraction" out unless a request asks for it.
+
+Set EXTRACT_SERVER_WORKERS > 1 to convert several documents concurrently for
+callers that pipeline paths; results are still written in input order. Workers
+are threads by default; EXTRACT_SERVER_POOL=process forks worker processes after
+the converter is initialized so they share its memory copy-on-write (Linux/macOS).
 """
-import json
 import sys
 import warnings
 import logging
 from pathlib import Path
 
-# Suppress all warnings and logging from Docling and its dependencies
-warnings.filterwarnings("ignore")
-logging.disable(logging.CRITICAL)  # Disable all logging
+# Suppress all warnings and logging from Docling and its dependencies when run
+# as the server (extract.py imports this module and keeps its own settings)
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.CRITICAL)  # Disable all logging
 
 import os
-import contextlib
-
+import itertools
+import multiprocessing
+import queue
+import threading
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Literal
+
+import msgspec
+from lxml import etree
 from docling.document_converter import DocumentConverter
 from docling.datamodel.base_models import InputFormat
+from docling_core.types.doc.document import RichTableCell, TableItem, TextItem
 from docling_core.types.doc.labels import DocItemLabel
 
 from lingua import LanguageDetectorBuilder
 
-# Build detector once at module load (includes all languages)
-_detector = LanguageDetectorBuilder.from_all_languages().build()
+# Language detector (all languages), built on first use by load_detector().
+# main() builds it with every model preloaded; single-shot importers such as
+# extract.py get one that loads only the models a document needs.
+_detector = None
+
+
+class Request(msgspec.Struct):
+    """A JSON request line on stdin."""
+
+    path: str
+    mode: Literal["full", "text"] = "full"
+    fields: frozenset[str] | None = None
+
+
+class ExtractResult(msgspec.Struct, rename="camel", omit_defaults=True):
+    """One result line on stdout. Unset fields are left out of the JSON."""
+
+    success: bool
+    text: str | msgspec.UnsetType = msgspec.UNSET
+    word_count: int | msgspec.UnsetType = msgspec.UNSET
+    char_count: int | msgspec.UnsetType = msgspec.UNSET
+    table_count: int | msgspec.UnsetType = msgspec.UNSET
+    image_count: int | msgspec.UnsetType = msgspec.UNSET
+    language: str | msgspec.UnsetType = msgspec.UNSET
+    language_confidence: float | msgspec.UnsetType = msgspec.UNSET
+    # Docling's dict is opaque to the schema and encoded as-is
+    extraction: dict | msgspec.UnsetType = msgspec.UNSET
+    error: str | msgspec.UnsetType = msgspec.UNSET
+
+
+# Result keys a request may ask for (everything but success/error)
+ALL_FIELDS = frozenset(
+    f.encode_name for f in msgspec.structs.fields(ExtractResult)
+) - {"success", "error"}
+
+# Fields that need the document text (or, without "text", its raw text items)
+_TEXT_STAT_FIELDS = frozenset({"wordCount", "charCount", "language", "languageConfidence"})
+_LANGUAGE_FIELDS = frozenset({"language", "languageConfidence"})
+
+# Shared encoder/decoder; anything the encoder can't serialize natively
+# (e.g. stray non-JSON scalars in Docling's dict) falls back to str()
+_encoder = msgspec.json.Encoder(enc_hook=str)
+_request_decoder = msgspec.json.Decoder(Request)
+
+# WordprocessingML tags read by extract_fast
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_T, _W_TAB, _W_BR, _W_P, _W_TBL = _W + "t", _W + "tab", _W + "br", _W + "p", _W + "tbl"
+_PIC = "{http://schemas.openxmlformats.org/drawingml/2006/picture}pic"
+# Word writes textboxes twice (mc:Choice and a legacy mc:Fallback copy)
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+# Converters available to extraction workers. Filled once in main() before any
+# worker starts, so forked process workers inherit an already-built converter.
+_converters: queue.SimpleQueue = queue.SimpleQueue()
+
+# Language detection first scores a short prefix and only rescans the longer
+# sample when the top confidence falls below _LANG_RETRY_CONFIDENCE
+_LANG_QUICK_CHARS = 512
+_LANG_SAMPLE_CHARS = 2000
+_LANG_RETRY_CONFIDENCE = 0.5
+
+# Chunk size for raw stdin reads in read_lines
+_READ_BYTES = 64 * 1024
+
+# Buffered stdout bytes that force a flush while more results are queued
+_FLUSH_BYTES = 64 * 1024
+
+# Characters per str.split() call in count_words
+_WORD_COUNT_CHUNK = 1 << 16
+
+# Everything except tables, which smart_extract_text flattens separately
+_NON_TABLE_LABELS = frozenset(DocItemLabel) - {DocItemLabel.TABLE}
 
 
 def detect_language(text: str, min_chars: int = 50) -> tuple[str, float]:
-    """Detect language using lingua. Returns (lang_code, confidence)."""
+    """Detect language using lingua. Returns (lang_code, confidence).
+
+    Scores a short prefix first and escalates to the longer sample only when the
+    result is ambiguous.
+    """
     if not text or len(text) < min_chars:
         return "unknown", 0.0
 
     try:
-        confidence_values = _detector.compute_language_confidence_values(text[:2000])
-        if confidence_values:
-            top = confidence_values[0]
-            lang = top.language.iso_code_639_1.name.lower()
-            confidence = top.value
-            return lang, confidence
-        return "unknown", 0.0
+        lang, confidence = _top_language(text[:_LANG_QUICK_CHARS])
+        if confidence < _LANG_RETRY_CONFIDENCE and len(text) > _LANG_QUICK_CHARS:
+            lang, confidence = _top_language(text[:_LANG_SAMPLE_CHARS])
+        return lang, confidence
     except Exception:
         return "unknown", 0.0
 
 
-@contextlib.contextmanager
-def suppress_stderr():
-    """Temporarily suppress stderr to hide Docling's verbose output."""
-    with open(os.devnull, 'w') as devnull:
-        old_stderr = sys.stderr
-        sys.stderr = devnull
-        try:
-            yield
-        finally:
-            sys.stderr = old_stderr
+def load_detector(preload: bool = False):
+    """Return the shared lingua detector, building it on the first call.
+
+    preload loads every language model up front (slow, ~1 GB) so a long-running
+    server doesn't pay lazy model loading mid-batch.
+    """
+    global _detector
+    if _detector is None:
+        builder = LanguageDetectorBuilder.from_all_languages()
+        if preload:
+            builder = builder.with_preloaded_language_models()
+        _detector = builder.build()
+    return _detector
+
+
+def _top_language(sample: str) -> tuple[str, float]:
+    """Most likely language of sample and its confidence."""
+    confidence_values = load_detector().compute_language_confidence_values(sample)
+    if confidence_values:
+        top = confidence_values[0]
+        return top.language.iso_code_639_1.name.lower(), top.value
+    return "unknown", 0.0
+
+
+def silence_stderr() -> None:
+    """Point fd 2 at /dev/null for the rest of the process.
+
+    Unlike swapping sys.stderr this also silences native libraries writing to
+    stderr directly, and it is set once rather than toggled around each document.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+    os.close(devnull)
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words, same result as len(text.split()).
+
+    Splits in fixed-size chunks so only one chunk's worth of word strings is
+    alive at a time instead of one list holding every word in the document. A
+    word cut by a chunk boundary is counted on both sides, so it is subtracted
+    once per boundary that falls between two non-whitespace characters.
+    """
+    count = 0
+    length = len(text)
+    for start in range(0, length, _WORD_COUNT_CHUNK):
+        count += len(text[start:start + _WORD_COUNT_CHUNK].split())
+        if start and not text[start - 1].isspace() and not text[start].isspace():
+            count -= 1
+    return count
 
 
 def strip_image_data(extraction: dict) -> dict:
-    """Remove base64 image data from extraction to reduce size."""
-    if "pictures" in extraction:
-        extraction["pictures"] = [
-            {k: v for k, v in pic.items() if k != "image"}
-            for pic in extraction["pictures"]
-        ]
+    """Remove base64 image data from extraction (in place) to reduce size."""
+    for pic in extraction.get("pictures", ()):
+        pic.pop("image", None)
     return extraction
 
 
+def table_text(table) -> str:
+    """Flatten a table to plain text: cells joined by ' | ', rows by newlines."""
+    # Grid cells are always TableCell (text: str), so read .text directly
+    rows = (
+        ' | '.join(cell.text for cell in row if cell.text)
+        for row in table.data.grid
+    )
+    return '\n'.join(row for row in rows if row)
+
+
 def smart_extract_text(doc) -> str:
     """Extract text without table markdown bloat.
 
@@ -76,84 +225,382 @@ def smart_extract_text(doc) -> str:
     2. Table cells as plain text (without markdown table formatting)
     """
     # Get non-table content as markdown
-    non_table_labels = set(DocItemLabel) - {DocItemLabel.TABLE}
-    non_table_content = doc.export_to_markdown(labels=non_table_labels)
+    non_table_content = doc.export_to_markdown(labels=_NON_TABLE_LABELS)
 
     # Get table cell text directly (no markdown formatting)
-    table_texts = []
-    for table in doc.tables:
-        rows = []
-        for row in table.data.grid:
-            cells = []
-            for cell in row:
-                # Use cell.text attribute if available, otherwise empty
-                if hasattr(cell, 'text') and cell.text:
-                    cells.append(cell.text)
-            if cells:
-                rows.append(' | '.join(cells))
-        if rows:
-            table_texts.append('\n'.join(rows))
-
-    # Combine non-table content with table text
-    if table_texts:
-        return non_table_content + '\n\n' + '\n\n'.join(table_texts)
-    return non_table_content
-
-
-def extract(converter: DocumentConverter, file_path: str) -> dict:
-    """Extract text and structure from a DOCX file using Docling."""
+    table_texts = (t for t in map(table_text, doc.tables) if t)
+
+    # Combine non-table content with table text in a single join, so the
+    # (possibly multi-MB) markdown is copied once rather than per concatenation
+    return '\n\n'.join(itertools.chain((non_table_content,), table_texts))
+
+
+def fill_text_fields(output: ExtractResult, text: str, fields: frozenset[str]) -> None:
+    """Set whichever of text, counts and language are requested from the full text."""
+    if "text" in fields:
+        output.text = text
+    if "wordCount" in fields:
+        output.word_count = count_words(text)
+    if "charCount" in fields:
+        output.char_count = len(text)
+    fill_language_fields(output, text, fields)
+
+
+def fill_language_fields(output: ExtractResult, sample: str, fields: frozenset[str]) -> None:
+    """Detect language on sample if either language field is requested."""
+    if not fields & _LANGUAGE_FIELDS:
+        return
+    lang, lang_confidence = detect_language(sample)
+    if "language" in fields:
+        output.language = lang
+    if "languageConfidence" in fields:
+        output.language_confidence = lang_confidence
+
+
+def text_stats(doc) -> tuple[int, int, str]:
+    """Word count, char count and a language sample from the document's raw text.
+
+    Used when text isn't requested, so the markdown export can be skipped. Walks
+    body items the way export_to_markdown does (headers, footers and other
+    furniture are left out) and covers text items plus plain table cells (rich
+    cells' contents are visited as text items). Counts are taken over item text
+    rather than the exported markdown, so they can differ slightly from counts
+    of the "text" field.
+    """
+    word_count = 0
+    char_count = 0
+    sample = []
+    sampled = 0
+    for text in _body_texts(doc):
+        word_count += count_words(text)
+        char_count += len(text)
+        if sampled < _LANG_SAMPLE_CHARS:
+            sample.append(text)
+            sampled += len(text) + 1
+    return word_count, char_count, "\n".join(sample)
+
+
+def _body_texts(doc) -> Iterator[str]:
+    """Text of body-layer text items and plain table cells, in reading order."""
+    for item, _level in doc.iterate_items():
+        if isinstance(item, TextItem):
+            yield item.text
+        elif isinstance(item, TableItem):
+            for cell in item.data.table_cells:
+                if not isinstance(cell, RichTableCell):
+                    yield cell.text
+
+
+def extract(
+    converter: DocumentConverter, file_path: str, fields: frozenset[str] = ALL_FIELDS
+) -> ExtractResult:
+    """Extract text and structure from a DOCX file using Docling.
+
+    Only the requested fields are computed: without "extraction" the full
+    export_to_dict() tree is never built, and without "text" the markdown export
+    is skipped (see text_stats). Table and image counts come straight from the
+    document.
+    """
     result = converter.convert(file_path)
+    doc = result.document
+    output = ExtractResult(success=True)
+
+    if "text" in fields:
+        # Use smart extraction to avoid table padding bloat
+        fill_text_fields(output, smart_extract_text(doc), fields)
+    elif fields & _TEXT_STAT_FIELDS:
+        word_count, char_count, sample = text_stats(doc)
+        if "wordCount" in fields:
+            output.word_count = word_count
+        if "charCount" in fields:
+            output.char_count = char_count
+        fill_language_fields(output, sample, fields)
+
+    if "tableCount" in fields:
+        output.table_count = len(doc.tables)
+    if "imageCount" in fields:
+        output.image_count = len(doc.pictures)
+
+    if "extraction" in fields:
+        # Get full structured extraction (stripped of image data)
+        output.extraction = strip_image_data(doc.export_to_dict())
+
+    return output
+
+
+def extract_fast(file_path: str, fields: frozenset[str] = ALL_FIELDS) -> ExtractResult:
+    """Extract plain text straight from word/document.xml, without Docling.
+
+    Paragraphs are separated by blank lines and tables contribute their cell
+    paragraphs inline, so text differs from the Docling markdown. Textbox
+    paragraphs come out just before the paragraph that anchors them.
+    """
+    paragraphs = []
+    # One run list per open w:p; textbox paragraphs nest inside their anchor's
+    open_runs: list[list[str]] = []
+    fallback_depth = 0
+    table_count = 0
+    image_count = 0
+
+    with zipfile.ZipFile(file_path) as docx, docx.open("word/document.xml") as xml:
+        tags = (_W_T, _W_TAB, _W_BR, _W_P, _W_TBL, _PIC, _MC_FALLBACK)
+        # Crawled files are untrusted: never expand entities or fetch anything
+        parse = etree.iterparse(
+            xml,
+            events=("start", "end"),
+            tag=tags,
+            resolve_entities=False,
+            no_network=True,
+        )
+        for event, el in parse:
+            tag = el.tag
+            if tag == _MC_FALLBACK:
+                # Skip the duplicate copy entirely
+                if event == "start":
+                    fallback_depth += 1
+                else:
+                    fallback_depth -= 1
+                    el.clear(keep_tail=True)
+                continue
+            if fallback_depth:
+                continue
 
-    # Use smart extraction to avoid table padding bloat
-    text = smart_extract_text(result.document)
+            if tag == _W_P:
+                if event == "start":
+                    open_runs.append([])
+                    continue
+                runs = open_runs.pop()
+                if runs:
+                    paragraphs.append("".join(runs))
+                # Children are already consumed; drop them to keep memory flat
+                el.clear(keep_tail=True)
+            elif event == "start":
+                continue
+            elif tag == _W_TBL:
+                table_count += 1
+            elif tag == _PIC:
+                image_count += 1
+            elif open_runs:
+                if tag == _W_T:
+                    if el.text:
+                        open_runs[-1].append(el.text)
+                elif tag == _W_TAB:
+                    open_runs[-1].append("\t")
+                else:
+                    open_runs[-1].append("\n")
+
+    output = ExtractResult(success=True)
+    fill_text_fields(output, "\n\n".join(paragraphs), fields)
+    if "tableCount" in fields:
+        output.table_count = table_count
+    if "imageCount" in fields:
+        output.image_count = image_count
+    return output
+
+
+def encode_line(obj: ExtractResult | dict) -> bytearray:
+    """Encode one newline-terminated JSON line.
+
+    Encodes into a fresh buffer so the newline is appended without copying the
+    (possibly multi-MB) message again.
+    """
+    line = bytearray()
+    _encoder.encode_into(obj, line)
+    line += b"\n"
+    return line
 
-    # Detect language
-    lang, lang_confidence = detect_language(text)
 
-    # Get full structured extraction (stripped of image data)
-    extraction = result.document.export_to_dict()
-    extraction = strip_image_data(extraction)
+def emit(obj: dict) -> None:
+    """Write one JSON line to stdout and flush immediately."""
+    out = sys.stdout.buffer
+    out.write(encode_line(obj))
+    out.flush()
 
-    return {
-        "text": text,
-        "wordCount": len(text.split()),
-        "charCount": len(text),
-        "tableCount": len(extraction.get("tables", [])),
-        "imageCount": len(extraction.get("pictures", [])),
-        "language": lang,
-        "languageConfidence": lang_confidence,
-        "extraction": extraction,
-    }
 
+def parse_request(line: str) -> Request:
+    """Parse a stdin line: a bare path or a JSON request."""
+    if not line.startswith("{"):
+        return Request(path=line)
+    return _request_decoder.decode(line)
 
-def main():
-    # Signal that we're ready (after imports complete)
-    print(json.dumps({"ready": True}), flush=True)
 
-    # Initialize converter ONCE (restricted to DOCX only to avoid loading PDF models)
-    converter = DocumentConverter(allowed_formats=[InputFormat.DOCX])
+def process_request(line: str, default_fields: frozenset[str]) -> bytearray:
+    """Handle one stdin line with a pooled converter; returns the encoded result line.
 
-    # Signal that converter is initialized
-    print(json.dumps({"initialized": True}), flush=True)
+    Never raises. Encoding happens here so process workers send back bytes
+    rather than pickling the whole extraction dict.
+    """
+    try:
+        request = parse_request(line)
+        file_path = request.path
+
+        fields = default_fields if request.fields is None else request.fields
+        if unknown := fields - ALL_FIELDS:
+            error = f"Unknown fields: {', '.join(sorted(unknown))}"
+            return encode_line(ExtractResult(success=False, error=error))
+
+        if request.mode == "text":
+            # Text mode has no Docling document to export; asking for it is an
+            # error like any unknown field, and it's dropped from the defaults
+            if request.fields is not None and "extraction" in request.fields:
+                error = 'Field "extraction" is not available in text mode'
+                return encode_line(ExtractResult(success=False, error=error))
+            fields -= {"extraction"}
+
+        if not Path(file_path).exists():
+            return encode_line(ExtractResult(success=False, error=f"File not found: {file_path}"))
 
-    # Read file paths from stdin, output JSON per line
-    for line in sys.stdin:
-        file_path = line.strip()
-        if not file_path:
-            continue
+        if request.mode == "text":
+            return encode_line(extract_fast(file_path, fields))
 
+        converter = _converters.get()
         try:
-            if not Path(file_path).exists():
-                print(json.dumps({"success": False, "error": f"File not found: {file_path}"}), flush=True)
-                continue
+            result = extract(converter, file_path, fields)
+        finally:
+            _converters.put(converter)
+        return encode_line(result)
+
+    except Exception as e:
+        return encode_line(ExtractResult(success=False, error=str(e)))
+
+
+def read_lines(fd: int) -> Iterator[str]:
+    """Yield stripped, non-empty lines from a raw fd, read in _READ_BYTES chunks.
 
-            # Suppress stderr during extraction to hide Docling's verbose output
-            with suppress_stderr():
-                result = extract(converter, file_path)
-            print(json.dumps({"success": True, **result}), flush=True)
+    Bypasses TextIOWrapper; only complete lines are decoded. surrogateescape
+    keeps non-UTF-8 path bytes round-trippable, as os.fsdecode would.
+    """
+    buf = bytearray()
+    while chunk := os.read(fd, _READ_BYTES):
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if line := line.strip():
+                yield line.decode(errors="surrogateescape")
+    if line := buf.strip():
+        yield line.decode(errors="surrogateescape")
+
+
+def _silence_worker_stdout() -> None:
+    """Point a forked worker's fd 1 at /dev/null.
+
+    A pool rebuilt while the writer thread is mid-write forks a copy of its
+    unflushed stdout buffer, which multiprocessing flushes when the worker
+    exits. Workers hand results back over the pool's pipes, so nothing they
+    write to stdout belongs in the output.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+
+def make_executor(workers: int, use_processes: bool) -> Executor:
+    """Create the extraction pool; process pools fork all workers up front."""
+    if not use_processes:
+        return ThreadPoolExecutor(max_workers=workers)
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_silence_worker_stdout,
+    )
+    # Fork all workers now, so the first request doesn't pay for it
+    executor.submit(int).result()
+    return executor
 
+
+def write_results(pending: queue.Queue) -> None:
+    """Emit results in submission order until a None sentinel arrives.
+
+    Lines are batched and flushed once nothing else is queued (the caller may be
+    waiting on the last line), once _FLUSH_BYTES have accumulated, or before
+    waiting on a result that isn't ready yet.
+    """
+    out = sys.stdout.buffer
+    lines: list[bytearray] = []
+    buffered = 0
+    while (future := pending.get()) is not None:
+        if lines and not future.done():
+            # Don't hold finished lines back behind a slow document
+            out.writelines(lines)
+            out.flush()
+            lines.clear()
+            buffered = 0
+        try:
+            line = future.result()
         except Exception as e:
-            print(json.dumps({"success": False, "error": str(e)}), flush=True)
+            # process_request never raises, so this is the pool itself failing,
+            # e.g. a forked worker killed by a segfault or the OOM killer
+            line = encode_line(ExtractResult(success=False, error=f"Extraction worker failed: {e}"))
+        lines.append(line)
+        buffered += len(line)
+        if pending.empty() or buffered >= _FLUSH_BYTES:
+            out.writelines(lines)
+            out.flush()
+            lines.clear()
+            buffered = 0
+    out.writelines(lines)
+    out.flush()
+
+
+def main():
+    # Signal that we're ready (after imports complete)
+    emit({"ready": True})
+
+    # Skip the structured extraction dict entirely when the caller only needs text/metadata
+    # (requests that list their own fields override this default)
+    default_fields = ALL_FIELDS
+    if "--no-extraction" in sys.argv[1:]:
+        default_fields -= {"extraction"}
+    workers = max(1, int(os.environ.get("EXTRACT_SERVER_WORKERS", "1")))
+    use_processes = os.environ.get("EXTRACT_SERVER_POOL", "thread") == "process"
+
+    # Build the detector with all models loaded before any worker starts, so
+    # threads never race to build it and forked workers share its memory
+    load_detector(preload=True)
+
+    # Initialize converters ONCE (restricted to DOCX only to avoid loading PDF models),
+    # building the DOCX pipeline up front so forked workers inherit it ready to use.
+    # Threads get one converter each, since DocumentConverter isn't documented as
+    # thread-safe; forked processes each see their own copy of a single one.
+    for _ in range(1 if use_processes else workers):
+        converter = DocumentConverter(allowed_formats=[InputFormat.DOCX])
+        converter.initialize_pipeline(InputFormat.DOCX)
+        _converters.put(converter)
+
+    # Signal that converter is initialized
+    emit({"initialized": True})
+
+    # Hide Docling's verbose output (Python and native) from here on; the
+    # handshake is done and results only ever go to stdout
+    silence_stderr()
+
+    # Fork the initial workers before the writer thread exists (a pool rebuilt
+    # below forks while it runs; its workers' stdout is silenced for that)
+    executor = make_executor(workers, use_processes)
+
+    # Futures are queued in input order; a writer thread emits each as it completes
+    pending: queue.Queue[Future | None] = queue.Queue(maxsize=workers)
+    writer = threading.Thread(target=write_results, args=(pending,), daemon=True)
+    writer.start()
+
+    try:
+        # Read requests from stdin, output JSON per line
+        for line in read_lines(sys.stdin.fileno()):
+            try:
+                future = executor.submit(process_request, line, default_fields)
+            except BrokenExecutor:
+                # A worker died and took the pool with it (the writer has already
+                # reported the affected requests); replace the pool and carry on
+                executor.shutdown(wait=False)
+                executor = make_executor(workers, use_processes)
+                future = executor.submit(process_request, line, default_fields)
+            pending.put(future)
+    finally:
+        executor.shutdown()
+
+    pending.put(None)
+    writer.join()
 
 
 if __name__ == "__main__":
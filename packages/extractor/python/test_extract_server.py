@@ -0,0 +1,152 @@
+"""
+stdlib unittest tests for extract_server.
+
+Run with (from packages/extractor/python):
+  uv run python -m unittest test_extract_server.py
+"""
+import random
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import msgspec
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import extract_server  # noqa: E402
+
+# Every character str.split() treats as whitespace, and word characters that
+# include zero-width ones it doesn't
+WHITESPACE = [chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()]
+WORD_CHARS = ["a", "Z", "é", "字", "語", "\u200b", "\ufeff", "-"]
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>{doctype}
+<w:document
+  xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+  xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+  xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+  xmlns:v="urn:schemas-microsoft-com:vml"><w:body>{body}</w:body></w:document>"""
+
+# A textbox anchored mid-paragraph, written the way Word does: the DrawingML
+# copy in mc:Choice and a VML copy in mc:Fallback
+TEXTBOX_BODY = (
+    "<w:p><w:r><w:t>Intro</w:t></w:r><w:r><mc:AlternateContent>"
+    "<mc:Choice Requires=\"wps\"><w:drawing><wps:txbx><w:txbxContent>"
+    "<w:p><w:r><w:t>Boxed</w:t></w:r></w:p>"
+    "</w:txbxContent></wps:txbx></w:drawing></mc:Choice>"
+    "<mc:Fallback><w:pict><v:textbox><w:txbxContent>"
+    "<w:p><w:r><w:t>Boxed</w:t></w:r></w:p>"
+    "</w:txbxContent></v:textbox></w:pict></mc:Fallback>"
+    "</mc:AlternateContent></w:r>"
+    "<w:r><w:t xml:space=\"preserve\"> tail</w:t></w:r></w:p>"
+    "<w:p><w:r><w:t>Next</w:t><w:tab/><w:t>x</w:t></w:r></w:p>"
+)
+
+
+def make_docx(path: Path, body: str, doctype: str = "") -> str:
+    """Write a minimal .docx whose word/document.xml wraps body."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", '<?xml version="1.0"?><Types/>')
+        z.writestr("word/document.xml", DOCUMENT_XML.format(doctype=doctype, body=body))
+    return str(path)
+
+
+def text_request(path: str, **request) -> dict:
+    """Run a text-mode request through process_request and decode the line."""
+    line = msgspec.json.encode({"path": path, "mode": "text", **request}).decode()
+    return msgspec.json.decode(
+        extract_server.process_request(line, extract_server.ALL_FIELDS)
+    )
+
+
+class CountWordsTests(unittest.TestCase):
+    def assertCountsLikeSplit(self, text: str):
+        for chunk in (1, 2, 3, 5, 8, 64):
+            with mock.patch.object(extract_server, "_WORD_COUNT_CHUNK", chunk):
+                self.assertEqual(
+                    extract_server.count_words(text),
+                    len(text.split()),
+                    f"chunk={chunk} text={text!r}",
+                )
+
+    def test_empty_and_blank(self):
+        self.assertCountsLikeSplit("")
+        self.assertCountsLikeSplit(" \u3000\n\xa0\t")
+
+    def test_words_spanning_chunk_boundaries(self):
+        self.assertCountsLikeSplit("abcdefgh")
+        self.assertCountsLikeSplit("ab cd ef gh")
+        self.assertCountsLikeSplit("  leading and trailing  ")
+
+    def test_cjk_without_spaces(self):
+        self.assertCountsLikeSplit("日本語のテキストには空白がない")
+        self.assertCountsLikeSplit("中文\u3000文本\u3000没有\u3000空格")
+
+    def test_randomized_unicode_whitespace(self):
+        rng = random.Random(1234)
+        alphabet = WORD_CHARS * 4 + WHITESPACE
+        for _ in range(500):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+            self.assertCountsLikeSplit(text)
+
+
+class ExtractFastTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def test_entities_are_not_expanded(self):
+        secret = self.dir / "secret.txt"
+        secret.write_text("SECRET")
+        doctype = (
+            f'<!DOCTYPE w:document [<!ENTITY ext SYSTEM "{secret.as_uri()}">'
+            '<!ENTITY int "EXPANDED">]>'
+        )
+        path = make_docx(
+            self.dir / "xxe.docx",
+            "<w:p><w:r><w:t>Title &ext; &int;</w:t></w:r></w:p>",
+            doctype,
+        )
+        text = extract_server.extract_fast(path, frozenset({"text"})).text
+        self.assertIn("Title", text)
+        self.assertNotIn("SECRET", text)
+        self.assertNotIn("EXPANDED", text)
+
+    def test_fallback_copy_is_skipped(self):
+        path = make_docx(self.dir / "textbox.docx", TEXTBOX_BODY)
+        text = extract_server.extract_fast(path, frozenset({"text"})).text
+        self.assertEqual(text.count("Boxed"), 1)
+
+    def test_textbox_paragraph_precedes_its_anchor(self):
+        path = make_docx(self.dir / "textbox.docx", TEXTBOX_BODY)
+        text = extract_server.extract_fast(path, frozenset({"text"})).text
+        self.assertEqual(text, "Boxed\n\nIntro tail\n\nNext\tx")
+
+    def test_missing_document_xml_is_an_error_line(self):
+        path = self.dir / "empty.docx"
+        with zipfile.ZipFile(path, "w") as z:
+            z.writestr("[Content_Types].xml", '<?xml version="1.0"?><Types/>')
+        result = text_request(str(path))
+        self.assertFalse(result["success"])
+        self.assertIn("word/document.xml", result["error"])
+
+    def test_non_zip_file_is_an_error_line(self):
+        path = self.dir / "not-a-docx.docx"
+        path.write_bytes(b"plain text, not a zip")
+        result = text_request(str(path))
+        self.assertFalse(result["success"])
+        self.assertTrue(result["error"])
+
+    def test_extraction_field_is_rejected(self):
+        path = make_docx(self.dir / "plain.docx", "<w:p><w:r><w:t>Hi</w:t></w:r></w:p>")
+        self.assertNotIn("extraction", text_request(path))
+        result = text_request(path, fields=["extraction"])
+        self.assertFalse(result["success"])
+        self.assertIn("extraction", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
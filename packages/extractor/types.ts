@@ -13,7 +13,7 @@ export interface ExtractedDocument {
   imageCount: number;
   language: string;
   languageConfidence: number;
-  extraction: Record<string, unknown>;
+  extraction?: Record<string, unknown>;
   extractedAt: string;
 }
 
@@ -27,4 +27,6 @@ export interface ExtractConfig {
   outputPrefix: string;
   batchSize: number;
   workers: number;
+  /** Write the structured Docling extraction as {hash}.json */
+  includeExtraction: boolean;
 }